@@ -0,0 +1,24 @@
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def run_closing_connections(view, request, *args, **kwargs):
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+def as_async_view(viewset, actions):
+    view = viewset.as_view(actions)
+    run = sync_to_async(run_closing_connections, thread_sensitive=False)
+
+    async def async_view(request, *args, **kwargs):
+        return await run(view, request, *args, **kwargs)
+
+    async_view.csrf_exempt = True
+    return async_view
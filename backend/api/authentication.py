@@ -0,0 +1,25 @@
+from django.core.cache import cache
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from .constants import TOKEN_CACHE_KEY, TOKEN_CACHE_TIMEOUT
+
+
+def forget_tokens(*keys):
+    cache.delete_many([TOKEN_CACHE_KEY.format(key) for key in keys])
+
+
+def forget_user_tokens(user_id):
+    forget_tokens(
+        *Token.objects.filter(user_id=user_id).values_list('key', flat=True)
+    )
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cache_key = TOKEN_CACHE_KEY.format(key)
+        credentials = cache.get(cache_key)
+        if credentials is None:
+            credentials = super().authenticate_credentials(key)
+            cache.set(cache_key, credentials, TOKEN_CACHE_TIMEOUT)
+        return credentials
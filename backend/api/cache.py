@@ -0,0 +1,51 @@
+import threading
+import time
+
+from django.core.cache import cache
+
+from .constants import VERSION_CACHE_KEY
+
+
+def get_version(name):
+    key = VERSION_CACHE_KEY.format(name)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name):
+    key = VERSION_CACHE_KEY.format(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+class VersionedSnapshot:
+    version_name = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._data = None
+
+    def load(self):
+        raise NotImplementedError
+
+    def get_data(self):
+        version = get_version(self.version_name)
+        if version == self._version:
+            return self._data
+
+        with self._lock:
+            if version != self._version:
+                self._data = self.load()
+                self._version = version
+        return self._data
+
+    def reset(self):
+        self._version = None
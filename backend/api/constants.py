@@ -1,2 +1,36 @@
 SITE_URL = 'foodgram.servehalflife.com'
 PAGE_SIZE = 6
+VERSION_CACHE_KEY = 'version:{}'
+SHOPPING_CART_VERSION = 'shopping_cart:{}'
+SHOPPING_LIST_CACHE_KEY = 'shopping_list:{}:{}:{}'
+SHOPPING_LIST_CACHE_TIMEOUT = 60 * 60 * 24
+INGREDIENTS_VERSION = 'ingredients'
+TAGS_VERSION = 'tags'
+PROFILE_VERSION = 'profile:{}'
+CURSOR_PAGINATION_MODE = 'cursor'
+PAYLOAD_SKIP_FIELDS = frozenset({'last_login'})
+RECIPE_IMAGE_VARIANTS = {
+    'image_thumbnail': (320, 320),
+    'image_medium': (960, 960),
+}
+AVATAR_VARIANTS = {'avatar_thumbnail': (128, 128)}
+IMAGE_VARIANT_QUALITY = 80
+UPLOAD_CHUNK_SIZE = 64 * 1024
+SHORT_LINK_CACHE_KEY = 'short_link:{}'
+SHORT_LINK_CACHE_TIMEOUT = 60 * 60 * 24
+SHORT_LINK_MISSING_TIMEOUT = 60 * 5
+SHORT_LINK_LOCAL_SIZE = 4096
+SHORT_LINK_LOCAL_TIMEOUT = 60
+SHORT_LINK_MISSING = 0
+TOKEN_CACHE_KEY = 'auth_token:{}'
+TOKEN_CACHE_TIMEOUT = 60 * 5
+RECIPES_VERSION = 'recipes'
+RECIPE_VERSION = 'recipe:{}'
+RESPONSE_CACHE_KEY = 'response:{}'
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+RESPONSE_CACHE_PARAMS = ('page', 'limit', 'tags', 'author')
+RESPONSE_CACHE_LIST_PARAMS = ('tags',)
+RESPONSE_CACHE_HEADERS = ('ETag', 'Last-Modified', 'Vary')
+RESPONSE_CACHE_STATS_KEY = 'response_cache:{}'
+RESPONSE_CACHE_HIT = 'hit'
+RESPONSE_CACHE_MISS = 'miss'
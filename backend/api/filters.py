@@ -1,21 +1,47 @@
+from django.db import connection
+from django.db.models import Exists, OuterRef, Value
+from django.db.models.functions import Lower
 from django_filters.rest_framework import FilterSet, filters
 
-from recipes.models import Ingredient, Recipe, Tag
+from recipes.models import Ingredient, Recipe
+from .tag_registry import tag_registry
+
+
+def get_tag_choices():
+    return [(slug, slug) for slug in tag_registry.get_ids()]
 
 
 class IngredientFilter(FilterSet):
-    name = filters.CharFilter(lookup_expr='startswith')
+    name = filters.CharFilter(method='filter_name')
 
     class Meta:
         model = Ingredient
         fields = ['name']
 
+    def filter_name(self, queryset, name, value):
+        value = value.lower()
+        queryset = queryset.order_by().annotate(name_lower=Lower('name'))
+        prefix = queryset.filter(name_lower__startswith=value)
+        if connection.vendor == 'sqlite':
+            prefix = prefix.filter(
+                name_lower__gte=value,
+                name_lower__lt=value[:-1] + chr(ord(value[-1]) + 1)
+            )
+        prefix = prefix.annotate(search_rank=Value(0))
+        substring = queryset.filter(
+            name_lower__contains=value
+        ).exclude(
+            name_lower__startswith=value
+        ).annotate(search_rank=Value(1))
+        return prefix.union(substring, all=True).order_by(
+            'search_rank', 'name'
+        )
+
 
 class RecipeFilter(FilterSet):
-    tags = filters.ModelMultipleChoiceFilter(
-        field_name='tags__slug',
-        to_field_name='slug',
-        queryset=Tag.objects.all(),
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices,
+        method='filter_tags'
     )
 
     is_favorited = filters.BooleanFilter(method='filter_is_favorited')
@@ -27,6 +53,15 @@ class RecipeFilter(FilterSet):
         model = Recipe
         fields = ('tags', 'author',)
 
+    def filter_tags(self, queryset, name, value):
+        tag_ids = tag_registry.get_ids()
+        return queryset.filter(Exists(
+            Recipe.tags.through.objects.filter(
+                recipe=OuterRef('pk'),
+                tag_id__in=[tag_ids[slug] for slug in value if slug in tag_ids]
+            )
+        ))
+
     def filter_is_favorited(self, queryset, name, value):
         user = self.request.user
         if value and user.is_authenticated:
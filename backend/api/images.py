@@ -0,0 +1,140 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from backend.storage import touch
+from recipes.models import Recipe
+from users.models import Profile
+from .authentication import forget_user_tokens
+from .cache import bump_version
+from .constants import (
+    AVATAR_VARIANTS,
+    IMAGE_VARIANT_QUALITY,
+    PROFILE_VERSION,
+    RECIPE_IMAGE_VARIANTS
+)
+from .response_cache import invalidate_recipes
+
+logger = logging.getLogger(__name__)
+
+if features.check('webp'):
+    VARIANT_FORMAT, VARIANT_EXTENSION = 'WEBP', 'webp'
+else:
+    VARIANT_FORMAT, VARIANT_EXTENSION = 'JPEG', 'jpg'
+
+executor = (
+    ThreadPoolExecutor(
+        max_workers=settings.IMAGE_PROCESSING_WORKERS,
+        thread_name_prefix='images'
+    ) if settings.IMAGE_PROCESSING_WORKERS else None
+)
+
+
+def get_image_variant(image, variant):
+    if (image and variant and PurePosixPath(variant.name).stem
+            == PurePosixPath(image.name).stem):
+        return variant
+    return image
+
+
+def needs_variants(instance, field_name, variants):
+    image = getattr(instance, field_name)
+    return bool(image) and any(
+        get_image_variant(image, getattr(instance, variant)) is image
+        for variant in variants
+    )
+
+
+def render_variant(image, size):
+    variant = image.copy()
+    variant.thumbnail(size)
+    mode = 'RGB' if VARIANT_FORMAT == 'JPEG' else 'RGBA'
+    if variant.mode not in ('RGB', mode):
+        variant = variant.convert(mode)
+
+    buffer = BytesIO()
+    variant.save(buffer, VARIANT_FORMAT, quality=IMAGE_VARIANT_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def save_variants(model, pk, field_name, variants, **extra):
+    instance = model.objects.filter(pk=pk).only(
+        field_name, *variants
+    ).first()
+    if instance is None or not getattr(instance, field_name):
+        return False
+
+    image = getattr(instance, field_name)
+    stem = PurePosixPath(image.name).stem
+    names = {
+        variant: getattr(instance, variant).field.generate_filename(
+            instance, f'{stem}.{VARIANT_EXTENSION}'
+        ) for variant in variants
+    }
+    missing = [
+        variant for variant, name in names.items()
+        if not touch(getattr(instance, variant).storage, name)
+    ]
+    if missing:
+        with image.open('rb'), Image.open(image) as source:
+            source = ImageOps.exif_transpose(source)
+            for variant in missing:
+                names[variant] = getattr(instance, variant).storage.save(
+                    names[variant], render_variant(source, variants[variant])
+                )
+
+    return bool(model.objects.filter(
+        pk=pk, **{field_name: image.name}
+    ).update(**names, **extra))
+
+
+def process_recipe_image(pk):
+    if save_variants(
+        Recipe,
+        pk,
+        'image',
+        RECIPE_IMAGE_VARIANTS,
+        rendered=None,
+        updated_at=timezone.now()
+    ):
+        invalidate_recipes(pk)
+
+
+def process_avatar(pk):
+    if save_variants(Profile, pk, 'avatar', AVATAR_VARIANTS):
+        Recipe.objects.filter(author_id=pk).update(rendered=None)
+        invalidate_recipes(
+            *Recipe.objects.filter(author_id=pk).values_list('pk', flat=True)
+        )
+        bump_version(PROFILE_VERSION.format(pk))
+        forget_user_tokens(pk)
+
+
+def run(task, pk):
+    try:
+        task(pk)
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', pk)
+
+
+def run_in_worker(task, pk):
+    try:
+        run(task, pk)
+    finally:
+        connections.close_all()
+
+
+def schedule(task, pk):
+    if executor is None:
+        transaction.on_commit(lambda: run(task, pk))
+    else:
+        transaction.on_commit(
+            lambda: executor.submit(run_in_worker, task, pk)
+        )
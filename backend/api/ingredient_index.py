@@ -0,0 +1,45 @@
+from bisect import bisect_left, bisect_right
+
+from recipes.models import Ingredient
+from .cache import VersionedSnapshot
+from .constants import INGREDIENTS_VERSION
+
+MAX_CHAR = '\U0010ffff'
+
+
+class IngredientIndex(VersionedSnapshot):
+    version_name = INGREDIENTS_VERSION
+
+    def load(self):
+        ingredients = sorted(
+            Ingredient.objects.values('id', 'name', 'measurement_unit'),
+            key=lambda item: (
+                item['name'].casefold(),
+                item['measurement_unit']
+            )
+        )
+        return (
+            [item['name'].casefold() for item in ingredients],
+            ingredients,
+            {item['id']: item for item in ingredients}
+        )
+
+    def search(self, value):
+        names, ingredients, _ = self.get_data()
+        if not value:
+            return ingredients
+
+        value = value.casefold()
+        start = bisect_left(names, value)
+        end = bisect_right(names, value + MAX_CHAR, lo=start)
+        return ingredients[start:end] + [
+            ingredient for name, ingredient in zip(names, ingredients)
+            if value in name and not name.startswith(value)
+        ]
+
+    def get(self, pk):
+        _, _, ingredients_by_id = self.get_data()
+        return ingredients_by_id.get(pk)
+
+
+ingredient_index = IngredientIndex()
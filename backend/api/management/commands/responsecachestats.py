@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from api.constants import RESPONSE_CACHE_HIT
+from api.response_cache import get_stats, reset_stats
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода'
+        )
+
+    def handle(self, *args, **options):
+        stats = get_stats()
+        total = sum(stats.values())
+        for outcome, value in stats.items():
+            self.stdout.write(f'{outcome}: {value}')
+        if total:
+            self.stdout.write(
+                f'Доля попаданий: {stats[RESPONSE_CACHE_HIT] / total:.1%}'
+            )
+        if options['reset']:
+            reset_stats()
+            self.stdout.write(self.style.SUCCESS('Счётчики обнулены'))
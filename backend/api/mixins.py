@@ -0,0 +1,151 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import (
+    get_conditional_response,
+    patch_vary_headers,
+    quote_etag
+)
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+
+from .cache import get_version
+from .constants import (
+    RESPONSE_CACHE_HEADERS,
+    RESPONSE_CACHE_HIT,
+    RESPONSE_CACHE_MISS,
+    RESPONSE_CACHE_TIMEOUT
+)
+from .ingredient_index import ingredient_index
+from .response_cache import make_key, record
+
+
+def make_etag(*parts):
+    return quote_etag(
+        hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+    )
+
+
+class ConditionalGetMixin:
+    etag_version = None
+    etag_vary = ()
+
+    def get_etag(self, request, *args, **kwargs):
+        if self.etag_version is None:
+            return None
+        return make_etag(get_version(self.etag_version))
+
+    def get_last_modified(self, request, *args, **kwargs):
+        return None
+
+    def conditional(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+        last_modified = self.get_last_modified(request, *args, **kwargs)
+        if etag is None and last_modified is None:
+            return handler(request, *args, **kwargs)
+
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and int(last_modified.timestamp())
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED
+        ):
+            if etag:
+                response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(
+                    last_modified.timestamp()
+                )
+            patch_vary_headers(response, self.etag_vary)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional(super().retrieve, request, *args, **kwargs)
+
+
+class AnonymousResponseCacheMixin:
+    def get_response_cache_versions(self):
+        return None
+
+    def get_response_cache_key(self, request):
+        if (not settings.RESPONSE_CACHE_ENABLED
+                or request.user.is_authenticated):
+            return None
+        versions = self.get_response_cache_versions()
+        return versions and make_key(request, versions)
+
+    def cached(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+
+        cached = cache.get(key)
+        if cached is not None:
+            record(RESPONSE_CACHE_HIT)
+            data, headers = cached
+            last_modified = headers.get('Last-Modified')
+            response = get_conditional_response(
+                request,
+                etag=headers.get('ETag'),
+                last_modified=(
+                    last_modified and parse_http_date_safe(last_modified)
+                )
+            ) or Response(data)
+            for header, value in headers.items():
+                response[header] = value
+            response['X-Cache'] = RESPONSE_CACHE_HIT.upper()
+            return response
+
+        record(RESPONSE_CACHE_MISS)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key,
+                (response.data, {
+                    header: response[header]
+                    for header in RESPONSE_CACHE_HEADERS
+                    if response.has_header(header)
+                }),
+                RESPONSE_CACHE_TIMEOUT
+            )
+        response['X-Cache'] = RESPONSE_CACHE_MISS.upper()
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+
+class IngredientIndexMixin:
+    def list(self, request, *args, **kwargs):
+        if not settings.INGREDIENT_INDEX_ENABLED:
+            return super().list(request, *args, **kwargs)
+
+        return Response(
+            ingredient_index.search(request.query_params.get('name'))
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not settings.INGREDIENT_INDEX_ENABLED:
+            return super().retrieve(request, *args, **kwargs)
+
+        try:
+            ingredient = ingredient_index.get(int(kwargs['pk']))
+        except ValueError:
+            ingredient = None
+        if ingredient is None:
+            raise NotFound
+        return Response(ingredient)
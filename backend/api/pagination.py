@@ -1,8 +1,49 @@
-from rest_framework.pagination import PageNumberPagination
+from collections import OrderedDict
 
-from api.constants import PAGE_SIZE
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from api.constants import CURSOR_PAGINATION_MODE, PAGE_SIZE
+
+
+class FoodGramCursorPagination(CursorPagination):
+    page_size = PAGE_SIZE
+    page_size_query_param = 'limit'
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(
+            queryset.query.order_by or queryset.model._meta.ordering
+        )
 
 
 class FoodGramPagination(PageNumberPagination):
     page_size = PAGE_SIZE
     page_size_query_param = 'limit'
+    mode_query_param = 'pagination'
+    cursor_pagination = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            request.query_params.get(self.mode_query_param)
+            == CURSOR_PAGINATION_MODE
+            or FoodGramCursorPagination.cursor_query_param
+            in request.query_params
+        ):
+            self.cursor_pagination = FoodGramCursorPagination()
+            return self.cursor_pagination.paginate_queryset(
+                queryset,
+                request,
+                view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_pagination is None:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ('count', None),
+            ('next', self.cursor_pagination.get_next_link()),
+            ('previous', self.cursor_pagination.get_previous_link()),
+            ('results', data)
+        ]))
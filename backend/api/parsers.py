@@ -0,0 +1,222 @@
+import base64
+import binascii
+import codecs
+import json
+import mimetypes
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.utils.datastructures import MultiValueDict
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser, MultiPartParser
+
+from .constants import UPLOAD_CHUNK_SIZE
+from .exceptions import RequestTooLarge
+
+
+def check_content_length(parser_context):
+    request = (parser_context or {}).get('request')
+    if request is None:
+        return
+
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    if length > settings.UPLOAD_MAX_SIZE:
+        raise RequestTooLarge()
+
+
+def close_with_request(parser_context, files):
+    request = (parser_context or {}).get('request')
+    if request is not None:
+        request._request._files = files
+
+
+class Base64FieldReader:
+    def __init__(self, field):
+        self.field = field
+        self.parts = []
+        self.state = 'json'
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.string = []
+        self.header = []
+        self.pending = ''
+        self.received = 0
+        self.file = None
+
+    def feed(self, chunk):
+        self.received += len(chunk)
+        if self.received > settings.UPLOAD_MAX_SIZE:
+            raise RequestTooLarge()
+
+        position = 0
+        while position < len(chunk):
+            if self.state == 'base64':
+                end = chunk.find('"', position)
+                if end == -1:
+                    self.decode(chunk[position:])
+                    return
+                self.decode(chunk[position:end])
+                self.finish()
+                position = end + 1
+                continue
+
+            char = chunk[position]
+            position += 1
+            if self.state == 'header':
+                self.read_header(char)
+            else:
+                self.read_json(char)
+
+    def read_json(self, char):
+        self.parts.append(char)
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif char == '\\':
+                self.escape = True
+            elif char == '"':
+                self.in_string = False
+                self.state = (
+                    'key' if self.depth == 1
+                    and ''.join(self.string) == self.field else 'json'
+                )
+            elif len(self.string) <= len(self.field):
+                self.string.append(char)
+            return
+
+        if char.isspace():
+            return
+        if char == ':' and self.state == 'key':
+            self.state = 'value'
+            return
+        if char == '"' and self.state == 'value':
+            self.parts.pop()
+            self.state = 'header'
+            self.header = []
+            return
+
+        self.state = 'json'
+        if char == '"':
+            self.in_string = True
+            self.string = []
+        elif char in '{[':
+            self.depth += 1
+        elif char in '}]':
+            self.depth -= 1
+
+    def read_header(self, char):
+        header = ''.join(self.header)
+        if char == '"':
+            self.parts.append(f'"{header}"')
+            self.state = 'json'
+        elif char == ',' and header.startswith('data:'):
+            self.open(header[len('data:'):].split(';')[0])
+        elif len(self.header) > 255 or not (
+            header + char
+        ).startswith('data:'[:len(header) + 1]):
+            self.open(None)
+            self.decode(header + char)
+        else:
+            self.header.append(char)
+
+    def open(self, content_type):
+        extension = content_type and mimetypes.guess_extension(content_type)
+        self.file = TemporaryUploadedFile(
+            f'{uuid.uuid4()}{extension or ""}',
+            content_type,
+            0,
+            None
+        )
+        self.state = 'base64'
+
+    def decode(self, data):
+        data = self.pending + data
+        if data.endswith('\\'):
+            data, self.pending = data[:-1], '\\'
+        else:
+            self.pending = ''
+        data = ''.join(
+            data.replace('\\/', '/').replace('\\n', '').replace('\\r', '')
+            .split()
+        )
+        usable = len(data) - len(data) % 4
+        self.pending = data[usable:] + self.pending
+
+        try:
+            decoded = base64.b64decode(data[:usable], validate=True)
+        except (binascii.Error, ValueError):
+            raise ParseError('Некорректные данные изображения.')
+        self.file.size += len(decoded)
+        if self.file.size > settings.UPLOAD_MAX_SIZE:
+            raise RequestTooLarge()
+        self.file.write(decoded)
+
+    def finish(self):
+        if self.pending.strip('='):
+            raise ParseError('Некорректные данные изображения.')
+        self.pending = ''
+        self.file.seek(0)
+        self.parts.append('null')
+        self.state = 'json'
+
+    def result(self):
+        if self.state not in ('json', 'key', 'value'):
+            raise ParseError('Неожиданный конец JSON.')
+
+        try:
+            data = json.loads(''.join(self.parts))
+        except ValueError as error:
+            raise ParseError(f'Ошибка разбора JSON - {error}')
+        if self.file is not None:
+            data[self.field] = self.file
+        return data
+
+
+class StreamingJSONParser(JSONParser):
+    stream_field = 'image'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        check_content_length(parser_context)
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        reader = Base64FieldReader(self.stream_field)
+
+        try:
+            for chunk in iter(lambda: stream.read(UPLOAD_CHUNK_SIZE), b''):
+                reader.feed(decoder.decode(chunk))
+            reader.feed(decoder.decode(b'', final=True))
+        except UnicodeDecodeError as error:
+            raise ParseError(f'Ошибка разбора JSON - {error}')
+        finally:
+            if reader.file is not None:
+                close_with_request(
+                    parser_context,
+                    MultiValueDict({reader.field: [reader.file]})
+                )
+        return reader.result()
+
+
+class MultiPartJSONParser(MultiPartParser):
+    data_field = 'data'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        check_content_length(parser_context)
+        parsed = super().parse(stream, media_type, parser_context)
+        if self.data_field not in parsed.data:
+            return parsed
+
+        close_with_request(parser_context, parsed.files)
+        try:
+            data = json.loads(parsed.data[self.data_field])
+        except ValueError as error:
+            raise ParseError(f'Ошибка разбора JSON - {error}')
+        if not isinstance(data, dict):
+            raise ParseError('Ожидался JSON-объект.')
+        data.update(parsed.files.dict())
+        return data
@@ -0,0 +1,74 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .cache import bump_version, get_version
+from .constants import (
+    RECIPE_VERSION,
+    RECIPES_VERSION,
+    RESPONSE_CACHE_HIT,
+    RESPONSE_CACHE_KEY,
+    RESPONSE_CACHE_LIST_PARAMS,
+    RESPONSE_CACHE_MISS,
+    RESPONSE_CACHE_PARAMS,
+    RESPONSE_CACHE_STATS_KEY
+)
+
+
+def normalize_param(params, name):
+    if name in RESPONSE_CACHE_LIST_PARAMS:
+        return ','.join(sorted(set(params.getlist(name))))
+    return params.get(name)
+
+
+def make_key(request, versions):
+    params = request.query_params
+    if set(params) - set(RESPONSE_CACHE_PARAMS):
+        return None
+
+    parts = [
+        request.scheme,
+        request.get_host(),
+        request.path,
+        *(get_version(name) for name in versions),
+        *(
+            f'{name}={normalize_param(params, name)}'
+            for name in RESPONSE_CACHE_PARAMS if name in params
+        )
+    ]
+    return RESPONSE_CACHE_KEY.format(
+        hashlib.md5('|'.join(map(str, parts)).encode()).hexdigest()
+    )
+
+
+def record(outcome):
+    key = RESPONSE_CACHE_STATS_KEY.format(outcome)
+    if not cache.add(key, 1, timeout=None):
+        cache.incr(key)
+
+
+def get_stats():
+    return {
+        outcome: cache.get(RESPONSE_CACHE_STATS_KEY.format(outcome), 0)
+        for outcome in (RESPONSE_CACHE_HIT, RESPONSE_CACHE_MISS)
+    }
+
+
+def reset_stats():
+    cache.delete_many([
+        RESPONSE_CACHE_STATS_KEY.format(outcome)
+        for outcome in (RESPONSE_CACHE_HIT, RESPONSE_CACHE_MISS)
+    ])
+
+
+def invalidate_recipes(*recipe_ids):
+    if not recipe_ids:
+        return
+
+    def bump():
+        bump_version(RECIPES_VERSION)
+        for recipe_id in recipe_ids:
+            bump_version(RECIPE_VERSION.format(recipe_id))
+
+    transaction.on_commit(bump)
@@ -1,8 +1,22 @@
+from functools import reduce
+from operator import or_
+
+from django.core.files.uploadedfile import UploadedFile
 from django.db import transaction
-from django.db.models import F
+from django.db.models import (
+    Case,
+    JSONField,
+    Manager,
+    Prefetch,
+    Q,
+    Value,
+    When,
+    prefetch_related_objects
+)
+from django.db.models.functions import Cast
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework.exceptions import ValidationError
-from rest_framework.fields import SerializerMethodField
+from rest_framework.fields import ImageField, SerializerMethodField
 from rest_framework.relations import PrimaryKeyRelatedField
 from rest_framework.serializers import ModelSerializer
 
@@ -15,10 +29,38 @@ from recipes.models import (
     ShoppingCart,
     Favourite
 )
+from .images import get_image_variant
+from .signals import recipe_updated
+from .tag_registry import tag_registry
+from .viewer_state import ViewerStateListSerializer, get_viewer_state
+
+
+class ImageVariantField(ImageField):
+    def __init__(self, variant, **kwargs):
+        self.variant = variant
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return get_image_variant(
+            super().get_attribute(instance),
+            getattr(instance, self.variant)
+        )
+
+
+class UploadedImageField(Base64ImageField):
+    def to_internal_value(self, data):
+        if isinstance(data, UploadedFile):
+            return ImageField.to_internal_value(self, data)
+        return super().to_internal_value(data)
 
 
 class ProfileSerializer(ModelSerializer):
     is_subscribed = SerializerMethodField()
+    avatar = ImageVariantField(
+        'avatar_thumbnail',
+        required=False,
+        allow_null=True
+    )
 
     class Meta:
         model = Profile
@@ -31,16 +73,14 @@ class ProfileSerializer(ModelSerializer):
             'is_subscribed',
             'avatar'
         )
+        list_serializer_class = ViewerStateListSerializer
 
-    def get_is_subscribed(self, obj):
-        request = self.context.get('request')
+    def prime_viewer_state(self, state, profiles):
+        state.prime(author_ids=[profile.pk for profile in profiles])
 
-        return (request and request.user.is_authenticated
-                and Subscription.objects.filter(
-                    user=request.user,
-                    author=obj
-                ).exists()
-                )
+    def get_is_subscribed(self, obj):
+        state = get_viewer_state(self.context.get('request'))
+        return state and state.is_subscribed(obj.pk)
 
 
 class AvatarSerializer(ModelSerializer):
@@ -52,7 +92,7 @@ class AvatarSerializer(ModelSerializer):
 
 
 class RecipeShortSerializer(ModelSerializer):
-    image = Base64ImageField()
+    image = ImageVariantField('image_thumbnail')
 
     class Meta:
         model = Recipe
@@ -65,7 +105,6 @@ class RecipeShortSerializer(ModelSerializer):
 
 
 class UserSubscriptionSerializer(ProfileSerializer):
-    recipes_count = SerializerMethodField()
     recipes = SerializerMethodField()
 
     class Meta:
@@ -73,20 +112,20 @@ class UserSubscriptionSerializer(ProfileSerializer):
         fields = ('id', 'username', 'first_name', 'last_name', 'email',
                   'avatar', 'is_subscribed', 'recipes_count', 'recipes')
         read_only_fields = ('email', 'username', 'first_name', 'last_name')
-
-    @staticmethod
-    def get_recipes_count(obj):
-        return obj.recipes.count()
+        list_serializer_class = ViewerStateListSerializer
 
     def get_recipes(self, obj):
-        request = self.context.get('request')
-        limit = request.GET.get('recipes_limit')
-        recipes = obj.recipes.all()
-        if limit:
-            try:
-                recipes = recipes[:int(limit)]
-            except ValueError:
-                pass
+        if hasattr(obj, 'limited_recipes'):
+            recipes = obj.limited_recipes
+        else:
+            request = self.context.get('request')
+            limit = request.GET.get('recipes_limit')
+            recipes = obj.recipes.all()
+            if limit:
+                try:
+                    recipes = recipes[:int(limit)]
+                except ValueError:
+                    pass
         serializer = RecipeShortSerializer(recipes, many=True, read_only=True)
         return serializer.data
 
@@ -128,13 +167,26 @@ class TagSerializer(ModelSerializer):
         fields = ('id', 'name', 'slug')
 
 
-class RecipeReadSerializer(ModelSerializer):
-    tags = TagSerializer(many=True, read_only=True)
-    author = ProfileSerializer(read_only=True)
+class AuthorPayloadSerializer(ProfileSerializer):
+    is_subscribed = None
+
+    class Meta(ProfileSerializer.Meta):
+        fields = (
+            'email',
+            'id',
+            'username',
+            'first_name',
+            'last_name',
+            'avatar'
+        )
+
+
+class RecipePayloadSerializer(ModelSerializer):
+    tags = SerializerMethodField()
+    author = AuthorPayloadSerializer(read_only=True)
     ingredients = SerializerMethodField()
-    image = Base64ImageField()
-    is_favorited = SerializerMethodField(read_only=True)
-    is_in_shopping_cart = SerializerMethodField(read_only=True)
+    image = ImageVariantField('image_medium')
+    thumbnail = ImageVariantField('image_thumbnail', source='image')
 
     class Meta:
         model = Recipe
@@ -143,37 +195,151 @@ class RecipeReadSerializer(ModelSerializer):
             'tags',
             'author',
             'ingredients',
-            'is_favorited',
-            'is_in_shopping_cart',
             'name',
             'image',
+            'thumbnail',
             'text',
             'cooking_time',
         )
 
+    def get_tags(self, obj):
+        return tag_registry.render(tag.pk for tag in obj.tags.all())
+
     def get_ingredients(self, obj):
-        recipe = obj
-        ingredients = recipe.ingredients.values(
+        return [
+            {
+                'id': item.ingredient.id,
+                'name': item.ingredient.name,
+                'measurement_unit': item.ingredient.measurement_unit,
+                'amount': item.amount
+            } for item in obj.ingredient_list.all()
+        ]
+
+    @classmethod
+    def store_many(cls, recipes):
+        if not recipes:
+            return
+
+        prefetch_related_objects(
+            recipes,
+            'author',
+            'tags',
+            Prefetch(
+                'ingredient_list',
+                queryset=IngredientInRecipe.objects.select_related(
+                    'ingredient'
+                ).order_by('ingredient__name')
+            )
+        )
+        for recipe in recipes:
+            recipe.rendered = cls(recipe).data
+
+        Recipe.objects.filter(reduce(or_, (
+            Q(pk=recipe.pk, updated_at=recipe.updated_at)
+            for recipe in recipes
+        ))).update(rendered=Case(*(
+            When(
+                pk=recipe.pk,
+                then=Cast(
+                    Value(recipe.rendered, output_field=JSONField()),
+                    JSONField()
+                )
+            ) for recipe in recipes
+        )))
+
+    @classmethod
+    def store(cls, recipe):
+        cls.store_many([recipe])
+        return recipe.rendered
+
+
+class RecipeListSerializer(ViewerStateListSerializer):
+    def to_representation(self, data):
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        RecipePayloadSerializer.store_many(
+            [recipe for recipe in recipes if recipe.rendered is None]
+        )
+        return super().to_representation(recipes)
+
+
+class RecipeReadSerializer(RecipePayloadSerializer):
+    author = ProfileSerializer(read_only=True)
+    thumbnail = None
+    is_favorited = SerializerMethodField(read_only=True)
+    is_in_shopping_cart = SerializerMethodField(read_only=True)
+
+    class Meta(RecipePayloadSerializer.Meta):
+        fields = (
             'id',
+            'tags',
+            'author',
+            'ingredients',
+            'is_favorited',
+            'is_in_shopping_cart',
             'name',
-            'measurement_unit',
-            amount=F('ingredientinrecipe__amount')
+            'image',
+            'text',
+            'cooking_time',
         )
-        return ingredients
+        list_serializer_class = RecipeListSerializer
 
-    def get_is_favorited(self, obj):
+    def prime_viewer_state(self, state, recipes):
+        state.prime(
+            recipe_ids=[recipe.pk for recipe in recipes],
+            author_ids=[recipe.author_id for recipe in recipes]
+        )
+
+    def to_representation(self, instance):
+        payload = instance.rendered
+        if payload is None:
+            payload = RecipePayloadSerializer.store(instance)
+
+        return {
+            'id': payload['id'],
+            'tags': payload['tags'],
+            'author': self.get_author(instance, payload['author']),
+            'ingredients': payload['ingredients'],
+            'is_favorited': self.get_is_favorited(instance),
+            'is_in_shopping_cart': self.get_is_in_shopping_cart(instance),
+            'name': payload['name'],
+            'image': self.build_url(
+                payload['thumbnail' if self.parent else 'image']
+            ),
+            'text': payload['text'],
+            'cooking_time': payload['cooking_time'],
+        }
+
+    def build_url(self, url):
         request = self.context.get('request')
-        user = request.user if request else None
+        if url and request:
+            return request.build_absolute_uri(url)
+        return url
+
+    def get_author(self, obj, author):
+        if author is None:
+            return None
+
+        return {
+            'email': author['email'],
+            'id': author['id'],
+            'username': author['username'],
+            'first_name': author['first_name'],
+            'last_name': author['last_name'],
+            'is_subscribed': self.get_is_subscribed(obj),
+            'avatar': self.build_url(author['avatar']),
+        }
 
-        return (user and user.is_authenticated
-                and user.favorites.filter(recipe=obj).exists())
+    def get_is_subscribed(self, obj):
+        state = get_viewer_state(self.context.get('request'))
+        return state and state.is_subscribed(obj.author_id)
 
-    def get_is_in_shopping_cart(self, obj):
-        request = self.context.get('request')
-        user = request.user if request else None
+    def get_is_favorited(self, obj):
+        state = get_viewer_state(self.context.get('request'))
+        return state and state.is_favorited(obj.pk)
 
-        return (user and user.is_authenticated
-                and user.shopping_cart.filter(recipe=obj).exists())
+    def get_is_in_shopping_cart(self, obj):
+        state = get_viewer_state(self.context.get('request'))
+        return state and state.is_in_shopping_cart(obj.pk)
 
 
 class IngredientInRecipeWriteSerializer(ModelSerializer):
@@ -196,7 +362,7 @@ class RecipeWriteSerializer(ModelSerializer):
     )
     author = ProfileSerializer(read_only=True)
     ingredients = IngredientInRecipeWriteSerializer(many=True, required=True)
-    image = Base64ImageField(required=True)
+    image = UploadedImageField(required=True)
 
     class Meta:
         model = Recipe
@@ -280,21 +446,56 @@ class RecipeWriteSerializer(ModelSerializer):
             recipe=recipe,
             ingredients=ingredients
         )
+        RecipePayloadSerializer.store(recipe)
 
         return recipe
 
+    @staticmethod
+    def update_ingredients_amounts(ingredients, recipe):
+        amounts = {
+            ingredient['ingredient'].pk: ingredient['amount']
+            for ingredient in ingredients
+        }
+        removed = []
+        changed = []
+
+        for item in recipe.ingredient_list.all():
+            if item.ingredient_id not in amounts:
+                removed.append(item.pk)
+                continue
+
+            amount = amounts.pop(item.ingredient_id)
+            if item.amount != amount:
+                item.amount = amount
+                changed.append(item)
+
+        if removed:
+            IngredientInRecipe.objects.filter(pk__in=removed).delete()
+        if changed:
+            IngredientInRecipe.objects.bulk_update(changed, ['amount'])
+        if amounts:
+            IngredientInRecipe.objects.bulk_create(
+                IngredientInRecipe(
+                    ingredient_id=ingredient_id,
+                    recipe=recipe,
+                    amount=amount
+                ) for ingredient_id, amount in amounts.items()
+            )
+
     @transaction.atomic
     def update(self, instance, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
 
-        instance.tags.clear()
-        instance.ingredients.clear()
-
         instance.tags.set(tags)
-        self.create_ingredients_amounts(ingredients, instance)
+        self.update_ingredients_amounts(ingredients, instance)
 
-        return super().update(instance, validated_data)
+        recipe = super().update(instance, validated_data)
+        RecipePayloadSerializer.store(recipe)
+        transaction.on_commit(
+            lambda: recipe_updated.send(sender=Recipe, instance=recipe)
+        )
+        return recipe
 
     def to_representation(self, instance):
         request = self.context.get('request')
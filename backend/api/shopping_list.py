@@ -0,0 +1,114 @@
+import csv
+import json
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+
+from recipes.models import IngredientInRecipe
+from .cache import get_version
+from .constants import (
+    INGREDIENTS_VERSION,
+    SHOPPING_CART_VERSION,
+    SHOPPING_LIST_CACHE_KEY,
+    SHOPPING_LIST_CACHE_TIMEOUT
+)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def get_shopping_list(user):
+    key = SHOPPING_LIST_CACHE_KEY.format(
+        user.pk,
+        get_version(SHOPPING_CART_VERSION.format(user.pk)),
+        get_version(INGREDIENTS_VERSION)
+    )
+    ingredients = cache.get(key)
+    if ingredients is not None:
+        yield from ingredients
+        return
+
+    ingredients = []
+    for ingredient in IngredientInRecipe.objects.filter(
+        recipe__shopping_cart__user=user
+    ).values(
+        'ingredient__name',
+        'ingredient__measurement_unit'
+    ).annotate(
+        amount=Sum('amount')
+    ).order_by(
+        'ingredient__name',
+        'ingredient__measurement_unit'
+    ).iterator():
+        ingredients.append(ingredient)
+        yield ingredient
+    cache.set(key, ingredients, SHOPPING_LIST_CACHE_TIMEOUT)
+
+
+def stream_txt(user, ingredients, today):
+    yield (
+        f'Список покупок для: {user.get_full_name()}\n\n'
+        f'Дата: {today:%Y-%m-%d}\n\n'
+    )
+    for ingredient in ingredients:
+        yield (
+            f'- {ingredient["ingredient__name"]} '
+            f'({ingredient["ingredient__measurement_unit"]})'
+            f' - {ingredient["amount"]}\n'
+        )
+    yield f'\nFoodgram ({today:%Y})'
+
+
+def stream_csv(user, ingredients, today):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('Название', 'Единица измерения', 'Количество'))
+    for ingredient in ingredients:
+        yield writer.writerow((
+            ingredient['ingredient__name'],
+            ingredient['ingredient__measurement_unit'],
+            ingredient['amount']
+        ))
+
+
+def stream_json(user, ingredients, today):
+    yield (
+        f'{{"user": {json.dumps(user.get_full_name(), ensure_ascii=False)}, '
+        f'"date": "{today:%Y-%m-%d}", "ingredients": ['
+    )
+    separator = ''
+    for ingredient in ingredients:
+        yield separator + json.dumps(
+            {
+                'name': ingredient['ingredient__name'],
+                'measurement_unit': ingredient['ingredient__measurement_unit'],
+                'amount': ingredient['amount']
+            },
+            ensure_ascii=False
+        )
+        separator = ', '
+    yield ']}'
+
+
+STREAMS = {
+    'txt': stream_txt,
+    'csv': stream_csv,
+    'json': stream_json,
+}
+
+
+def shopping_list_response(user, export_format, content_type, preload=False):
+    ingredients = get_shopping_list(user)
+    if preload:
+        ingredients = list(ingredients)
+    stream = STREAMS[export_format](user, ingredients, datetime.today())
+    response = StreamingHttpResponse(
+        stream,
+        content_type=f'{content_type}; charset=utf-8'
+    )
+    filename = f'{user.username}_shopping_list.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
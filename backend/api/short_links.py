@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from recipes.constants import SHORT_LINK_ALPHABET, SHORT_LINK_HASH
+from recipes.models import Recipe
+from .constants import (
+    SHORT_LINK_CACHE_KEY,
+    SHORT_LINK_CACHE_TIMEOUT,
+    SHORT_LINK_LOCAL_SIZE,
+    SHORT_LINK_LOCAL_TIMEOUT,
+    SHORT_LINK_MISSING,
+    SHORT_LINK_MISSING_TIMEOUT
+)
+
+
+class ShortLinkResolver:
+    def __init__(self, size=SHORT_LINK_LOCAL_SIZE):
+        self._lock = threading.Lock()
+        self._local = OrderedDict()
+        self._size = size
+
+    def is_valid(self, code):
+        return len(code) == SHORT_LINK_HASH and all(
+            char in SHORT_LINK_ALPHABET for char in code
+        )
+
+    def get_local(self, code):
+        with self._lock:
+            item = self._local.get(code)
+            if item is None:
+                return None
+            recipe_id, expires = item
+            if expires < time.monotonic():
+                del self._local[code]
+                return None
+            self._local.move_to_end(code)
+            return recipe_id
+
+    def set_local(self, code, recipe_id):
+        with self._lock:
+            self._local[code] = (
+                recipe_id, time.monotonic() + SHORT_LINK_LOCAL_TIMEOUT
+            )
+            self._local.move_to_end(code)
+            while len(self._local) > self._size:
+                self._local.popitem(last=False)
+
+    def resolve(self, code):
+        if not self.is_valid(code):
+            return None
+
+        recipe_id = self.get_local(code)
+        if recipe_id is not None:
+            return recipe_id
+
+        key = SHORT_LINK_CACHE_KEY.format(code)
+        recipe_id = cache.get(key)
+        if recipe_id is None:
+            recipe_id = Recipe.objects.filter(
+                short_link_hash=code
+            ).values_list('pk', flat=True).first()
+            if recipe_id is None:
+                cache.set(
+                    key, SHORT_LINK_MISSING, SHORT_LINK_MISSING_TIMEOUT
+                )
+                return None
+            cache.set(key, recipe_id, SHORT_LINK_CACHE_TIMEOUT)
+        elif recipe_id == SHORT_LINK_MISSING:
+            return None
+
+        self.set_local(code, recipe_id)
+        return recipe_id
+
+    def remember(self, code, recipe_id):
+        cache.set(
+            SHORT_LINK_CACHE_KEY.format(code),
+            recipe_id,
+            SHORT_LINK_CACHE_TIMEOUT
+        )
+        self.set_local(code, recipe_id)
+
+    def forget(self, code):
+        cache.delete(SHORT_LINK_CACHE_KEY.format(code))
+        with self._lock:
+            self._local.pop(code, None)
+
+
+short_links = ShortLinkResolver()
@@ -0,0 +1,190 @@
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete
+)
+from django.dispatch import Signal, receiver
+from rest_framework.authtoken.models import Token
+
+from recipes.models import (
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from recipes.signals import data_imported
+from users.models import Profile
+from .authentication import forget_tokens, forget_user_tokens
+from .cache import bump_version
+from .constants import (
+    AVATAR_VARIANTS,
+    INGREDIENTS_VERSION,
+    PAYLOAD_SKIP_FIELDS,
+    PROFILE_VERSION,
+    RECIPE_IMAGE_VARIANTS,
+    SHOPPING_CART_VERSION,
+    TAGS_VERSION
+)
+from .images import (
+    needs_variants,
+    process_avatar,
+    process_recipe_image,
+    schedule
+)
+from .response_cache import invalidate_recipes
+from .short_links import short_links
+from .tag_registry import tag_registry
+
+recipe_updated = Signal()
+
+
+def invalidate_shopping_list(user_id):
+    transaction.on_commit(
+        lambda: bump_version(SHOPPING_CART_VERSION.format(user_id))
+    )
+
+
+@receiver((post_save, post_delete), sender=ShoppingCart)
+def shopping_cart_changed(sender, instance, **kwargs):
+    invalidate_shopping_list(instance.user_id)
+
+
+@receiver(recipe_updated)
+def recipe_in_carts_changed(sender, instance, **kwargs):
+    for user_id in instance.shopping_cart.values_list('user_id', flat=True):
+        invalidate_shopping_list(user_id)
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def ingredient_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_version(INGREDIENTS_VERSION))
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: bump_version(TAGS_VERSION))
+    transaction.on_commit(tag_registry.reset)
+
+
+@receiver(post_save, sender=Profile)
+def profile_changed(sender, instance, **kwargs):
+    transaction.on_commit(
+        lambda: bump_version(PROFILE_VERSION.format(instance.pk))
+    )
+
+
+def reset_payloads(queryset):
+    queryset.exclude(rendered=None).update(rendered=None)
+
+
+def affects_payload(update_fields):
+    return not update_fields or not update_fields <= PAYLOAD_SKIP_FIELDS
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_saved(sender, instance, update_fields, **kwargs):
+    if affects_payload(update_fields):
+        reset_payloads(Recipe.objects.filter(pk=instance.pk))
+        invalidate_recipes(instance.pk)
+
+
+@receiver((post_save, post_delete), sender=IngredientInRecipe)
+def recipe_ingredients_changed(sender, instance, **kwargs):
+    reset_payloads(Recipe.objects.filter(pk=instance.recipe_id))
+    invalidate_recipes(instance.recipe_id)
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def recipe_tags_changed(sender, instance, action, reverse, **kwargs):
+    if action.startswith('post_') and not reverse:
+        reset_payloads(Recipe.objects.filter(pk=instance.pk))
+        invalidate_recipes(instance.pk)
+
+
+@receiver((post_save, pre_delete), sender=Ingredient)
+def ingredient_payloads_changed(sender, instance, **kwargs):
+    reset_payloads(Recipe.objects.filter(ingredients=instance))
+
+
+@receiver((post_save, pre_delete), sender=Tag)
+def tag_payloads_changed(sender, instance, **kwargs):
+    reset_payloads(Recipe.objects.filter(tags=instance))
+
+
+@receiver((post_save, pre_delete), sender=Profile)
+def author_payloads_changed(sender, instance, update_fields=None, **kwargs):
+    if affects_payload(update_fields):
+        reset_payloads(Recipe.objects.filter(author=instance))
+        invalidate_recipes(*instance.recipes.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    key = instance.key
+    transaction.on_commit(lambda: forget_tokens(key))
+
+
+@receiver(post_save, sender=Profile)
+def profile_credentials_changed(sender, instance, update_fields, **kwargs):
+    if affects_payload(update_fields):
+        transaction.on_commit(lambda: forget_user_tokens(instance.pk))
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created and instance.short_link_hash:
+        transaction.on_commit(
+            lambda: short_links.remember(
+                instance.short_link_hash, instance.pk
+            )
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    invalidate_recipes(instance.pk)
+    transaction.on_commit(
+        lambda: short_links.forget(instance.short_link_hash)
+    )
+
+
+def schedule_variants(instance, update_fields, field_name, variants, task):
+    if ((not update_fields or field_name in update_fields)
+            and needs_variants(instance, field_name, variants)):
+        schedule(task, instance.pk)
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_image_saved(sender, instance, update_fields, **kwargs):
+    schedule_variants(
+        instance,
+        update_fields,
+        'image',
+        RECIPE_IMAGE_VARIANTS,
+        process_recipe_image
+    )
+
+
+@receiver(post_save, sender=Profile)
+def avatar_saved(sender, instance, update_fields, **kwargs):
+    schedule_variants(
+        instance,
+        update_fields,
+        'avatar',
+        AVATAR_VARIANTS,
+        process_avatar
+    )
+
+
+@receiver(data_imported, sender=Ingredient)
+def ingredients_imported(sender, **kwargs):
+    bump_version(INGREDIENTS_VERSION)
+
+
+@receiver(data_imported, sender=Tag)
+def tags_imported(sender, **kwargs):
+    bump_version(TAGS_VERSION)
+    tag_registry.reset()
@@ -0,0 +1,33 @@
+from recipes.models import Tag
+from .cache import VersionedSnapshot
+from .constants import TAGS_VERSION
+
+
+class TagRegistry(VersionedSnapshot):
+    version_name = TAGS_VERSION
+
+    def load(self):
+        tags = {
+            tag['id']: tag
+            for tag in Tag.objects.values('id', 'name', 'slug')
+        }
+        return tags, {tag['slug']: tag['id'] for tag in tags.values()}
+
+    def get(self, pk):
+        tags, _ = self.get_data()
+        if pk not in tags:
+            self.reset()
+            tags, _ = self.get_data()
+        return tags.get(pk)
+
+    def render(self, tag_ids):
+        return [
+            tag for tag in map(self.get, sorted(tag_ids)) if tag is not None
+        ]
+
+    def get_ids(self):
+        _, ids_by_slug = self.get_data()
+        return ids_by_slug
+
+
+tag_registry = TagRegistry()
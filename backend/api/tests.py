@@ -0,0 +1,407 @@
+import base64
+import json
+import shutil
+import tempfile
+import time
+from io import BytesIO
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+    override_settings
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from PIL import Image
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import (
+    Favourite,
+    Ingredient,
+    IngredientInRecipe,
+    Recipe,
+    ShoppingCart,
+    Tag
+)
+from users.models import Profile, Subscription
+from .filters import IngredientFilter, RecipeFilter
+from .tag_registry import tag_registry
+
+MEDIA_ROOT = tempfile.mkdtemp()
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def make_image():
+    buffer = BytesIO()
+    Image.new('RGB', (8, 8), 'red').save(buffer, 'PNG')
+    return 'data:image/png;base64,' + base64.b64encode(
+        buffer.getvalue()
+    ).decode()
+
+
+def create_recipes(authors, tags, ingredients, count):
+    recipes = [
+        Recipe.objects.create(
+            name=f'Рецепт {index}',
+            author=authors[index % len(authors)],
+            text='Описание',
+            cooking_time=10,
+            image='recipes/test.png'
+        ) for index in range(count)
+    ]
+    for recipe in recipes:
+        recipe.tags.set(tags[:2])
+    IngredientInRecipe.objects.bulk_create(
+        IngredientInRecipe(recipe=recipe, ingredient=ingredient, amount=5)
+        for recipe in recipes for ingredient in ingredients[:3]
+    )
+    return recipes
+
+
+class RecipeListQueriesTest(TestCase):
+    page_sizes = (1, 6, 20)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Profile.objects.create_user(
+            username='reader', email='reader@example.com', password='pass'
+        )
+        authors = [
+            Profile.objects.create_user(
+                username=f'author{index}',
+                email=f'author{index}@example.com',
+                password='pass'
+            ) for index in range(3)
+        ]
+        tags = [
+            Tag.objects.create(name=f'Тег {index}', slug=f'tag{index}')
+            for index in range(3)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            ) for index in range(3)
+        ]
+        recipes = create_recipes(authors, tags, ingredients, 25)
+        Subscription.objects.create(user=cls.user, author=authors[0])
+        Favourite.objects.create(user=cls.user, recipe=recipes[0])
+        ShoppingCart.objects.create(user=cls.user, recipe=recipes[1])
+        tag_registry.reset()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_page(self, limit):
+        response = self.client.get('/api/recipes/', {'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), limit)
+
+    def test_list_query_count_does_not_depend_on_page_size(self):
+        self.get_page(1)
+        for limit in self.page_sizes:
+            with self.subTest(limit=limit):
+                Recipe.objects.update(rendered=None)
+                with self.assertNumQueries(9):
+                    self.get_page(limit)
+                with self.assertNumQueries(5):
+                    self.get_page(limit)
+
+
+class RecipeConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = Profile.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        cls.tag = Tag.objects.create(name='Тег', slug='tag')
+        ingredient = Ingredient.objects.create(
+            name='Ингредиент', measurement_unit='г'
+        )
+        cls.recipe = create_recipes([author], [cls.tag], [ingredient], 1)[0]
+
+    def test_tag_rename_is_not_hidden_by_if_modified_since(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = 'Новый тег'
+            self.tag.save()
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['tags'][0]['name'], 'Новый тег')
+
+
+class ShoppingListCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Profile.objects.create_user(
+            username='reader', email='reader@example.com', password='pass'
+        )
+        cls.ingredient = Ingredient.objects.create(
+            name='Мука', measurement_unit='г'
+        )
+        recipe = create_recipes([cls.user], [], [cls.ingredient], 1)[0]
+        ShoppingCart.objects.create(user=cls.user, recipe=recipe)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def download(self):
+        response = self.client.get(
+            '/api/recipes/download_shopping_cart/', {'format': 'json'}
+        )
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b''.join(response.streaming_content))
+
+    def test_ingredient_rename_refreshes_cached_list(self):
+        self.assertEqual(self.download()['ingredients'][0]['name'], 'Мука')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ingredient.name = 'Мука пшеничная'
+            self.ingredient.save()
+
+        self.assertEqual(
+            self.download()['ingredients'][0]['name'], 'Мука пшеничная'
+        )
+
+
+@override_settings(INGREDIENT_INDEX_ENABLED=False)
+class IngredientSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ingredients = {
+            name: Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in (
+                'Морковь', 'морская соль', 'Помидоры', 'Сахар', 'Яблоки',
+                'Pizza'
+            )
+        }
+
+    def search(self, value):
+        response = self.client.get('/api/ingredients/', {'name': value})
+        self.assertEqual(response.status_code, 200)
+        return [ingredient['name'] for ingredient in response.data]
+
+    def test_prefix_matches_go_first(self):
+        self.assertEqual(
+            self.search('ОР'), ['Морковь', 'Помидоры', 'морская соль']
+        )
+        self.assertEqual(self.search('мор'), ['Морковь', 'морская соль'])
+        self.assertEqual(self.search('я'), ['Яблоки', 'морская соль'])
+        self.assertEqual(self.search('PIZ'), ['Pizza'])
+
+    def test_retrieve_ignores_name_filter(self):
+        ingredient = self.ingredients['Сахар']
+        response = self.client.get(
+            f'/api/ingredients/{ingredient.pk}/', {'name': 'мор'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Сахар')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class RecipeUpdateWritesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.addClassCleanup(shutil.rmtree, MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Profile.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        cls.tags = [
+            Tag.objects.create(name=f'Тег {index}', slug=f'tag{index}')
+            for index in range(2)
+        ]
+        cls.ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            ) for index in range(2)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.data = {
+            'name': 'Рецепт',
+            'text': 'Описание',
+            'cooking_time': 10,
+            'image': make_image(),
+            'tags': [tag.pk for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.pk, 'amount': 5}
+                for ingredient in self.ingredients
+            ],
+        }
+        response = self.client.post('/api/recipes/', self.data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.recipe_id = response.data['id']
+
+    def get_writes(self, data):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(
+                f'/api/recipes/{self.recipe_id}/', data, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(WRITE_STATEMENTS)
+        ]
+
+    def get_table_writes(self, writes, model):
+        return [sql for sql in writes if model._meta.db_table in sql]
+
+    def assertRecipeSaveSkipsPayload(self, writes):
+        saves = [sql for sql in writes if '"name" = ' in sql]
+        self.assertEqual(len(saves), 1)
+        self.assertNotIn('"rendered"', saves[0])
+
+    def test_noop_update_does_not_touch_tags_or_ingredients(self):
+        writes = self.get_writes(self.data)
+
+        self.assertEqual(
+            self.get_table_writes(writes, IngredientInRecipe), []
+        )
+        self.assertEqual(
+            self.get_table_writes(writes, Recipe.tags.through), []
+        )
+        self.assertRecipeSaveSkipsPayload(writes)
+        self.assertEqual(len(writes), 3)
+
+    def test_single_ingredient_change_updates_one_row(self):
+        self.data['ingredients'][0]['amount'] = 7
+        writes = self.get_writes(self.data)
+
+        ingredient_writes = self.get_table_writes(writes, IngredientInRecipe)
+        self.assertEqual(len(ingredient_writes), 1)
+        self.assertTrue(ingredient_writes[0].startswith('UPDATE'))
+        self.assertEqual(
+            self.get_table_writes(writes, Recipe.tags.through), []
+        )
+        self.assertRecipeSaveSkipsPayload(writes)
+        self.assertEqual(len(writes), 4)
+        self.assertEqual(
+            IngredientInRecipe.objects.get(
+                recipe_id=self.recipe_id,
+                ingredient=self.ingredients[0]
+            ).amount,
+            7
+        )
+
+
+@skipUnless(
+    connection.vendor == 'postgresql',
+    'Планы запросов проверяются только на PostgreSQL'
+)
+class RecipeFilterIndexesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = Profile.objects.create_user(
+            username='author', email='author@example.com', password='pass'
+        )
+        tags = [
+            Tag.objects.create(name=f'Тег {index}', slug=f'tag{index}')
+            for index in range(2)
+        ]
+        ingredients = [
+            Ingredient.objects.create(
+                name=f'Ингредиент {index}', measurement_unit='г'
+            ) for index in range(3)
+        ]
+        cls.recipe = create_recipes([cls.user], tags, ingredients, 10)[0]
+        Favourite.objects.create(user=cls.user, recipe=cls.recipe)
+        ShoppingCart.objects.create(user=cls.user, recipe=cls.recipe)
+        tag_registry.reset()
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+        self.addCleanup(self.reset_seqscan)
+
+    def reset_seqscan(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_seqscan')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+
+    def test_author_filter_uses_author_id_index(self):
+        self.assertUsesIndex(
+            Recipe.objects.filter(author=self.user).order_by('-id')[:6],
+            'recipe_author_id_idx'
+        )
+
+    def test_tags_filter_uses_tag_recipe_index(self):
+        self.assertUsesIndex(
+            RecipeFilter(
+                {'tags': ['tag0']}, queryset=Recipe.objects.all()
+            ).qs[:6],
+            'recipe_tags_tag_recipe_idx'
+        )
+
+    def test_ingredient_prefix_search_uses_lower_index(self):
+        prefix, substring = IngredientFilter(
+            {'name': 'ингр'}, queryset=Ingredient.objects.all()
+        ).qs.query.combined_queries
+        self.assertIn(
+            'ingredient_name_lower_idx', prefix.explain(connection.alias)
+        )
+
+    def test_recipe_lookups_use_recipe_user_indexes(self):
+        self.assertUsesIndex(
+            Favourite.objects.filter(
+                recipe=self.recipe
+            ).values_list('user_id', flat=True),
+            'favourite_recipe_user_idx'
+        )
+        self.assertUsesIndex(
+            ShoppingCart.objects.filter(
+                recipe=self.recipe
+            ).values_list('user_id', flat=True),
+            'shopping_cart_recipe_user_idx'
+        )
+
+
+class TokenRevocationTest(TransactionTestCase):
+    def setUp(self):
+        self.user = Profile.objects.create_user(
+            username='reader', email='reader@example.com', password='pass'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(self.get_me().status_code, 200)
+
+    def get_me(self):
+        return self.client.get('/api/users/me/')
+
+    def test_logout_revokes_cached_token(self):
+        response = self.client.post('/api/auth/token/logout/')
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.get_me().status_code, 401)
+
+    def test_token_delete_in_atomic_revokes_cached_token(self):
+        with transaction.atomic():
+            Token.objects.filter(pk=self.token.pk).delete()
+
+        self.assertEqual(self.get_me().status_code, 401)
+
+    def test_user_delete_in_atomic_revokes_cached_token(self):
+        with transaction.atomic():
+            Profile.objects.filter(pk=self.user.pk).delete()
+
+        self.assertEqual(self.get_me().status_code, 401)
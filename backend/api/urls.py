@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from .async_views import as_async_view
 from .views import IngredientViewSet, RecipeViewSet, TagViewSet, ProfileViewSet
 
 app_name = 'api'
@@ -16,3 +18,29 @@ urlpatterns = [
     path('auth/', include('djoser.urls.authtoken')),
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_VIEWS_ENABLED:
+    urlpatterns = [
+        path(
+            'ingredients/',
+            as_async_view(IngredientViewSet, {'get': 'list'})
+        ),
+        path(
+            'ingredients/<int:pk>/',
+            as_async_view(IngredientViewSet, {'get': 'retrieve'})
+        ),
+        path('tags/', as_async_view(TagViewSet, {'get': 'list'})),
+        path('tags/<int:pk>/', as_async_view(TagViewSet, {'get': 'retrieve'})),
+        path(
+            'recipes/',
+            as_async_view(RecipeViewSet, {'get': 'list', 'post': 'create'})
+        ),
+        path(
+            'recipes/<int:pk>/',
+            as_async_view(RecipeViewSet, {
+                'get': 'retrieve',
+                'patch': 'partial_update',
+                'delete': 'destroy'
+            })
+        ),
+    ] + urlpatterns
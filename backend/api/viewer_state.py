@@ -0,0 +1,89 @@
+from django.db.models import Manager
+from rest_framework.serializers import ListSerializer
+
+from recipes.models import Favourite, ShoppingCart
+from users.models import Subscription
+
+
+class ViewerState:
+    def __init__(self, user):
+        self.user = user
+        self.favorites = set()
+        self.shopping_cart = set()
+        self.subscriptions = set()
+        self.loaded_recipes = set()
+        self.loaded_authors = set()
+
+    def prime(self, recipe_ids=(), author_ids=()):
+        if not self.user.is_authenticated:
+            return
+
+        recipe_ids = set(recipe_ids) - self.loaded_recipes
+        if recipe_ids:
+            self.favorites.update(Favourite.objects.filter(
+                user=self.user, recipe_id__in=recipe_ids
+            ).values_list('recipe_id', flat=True))
+            self.shopping_cart.update(ShoppingCart.objects.filter(
+                user=self.user, recipe_id__in=recipe_ids
+            ).values_list('recipe_id', flat=True))
+            self.loaded_recipes.update(recipe_ids)
+
+        author_ids = set(author_ids) - self.loaded_authors - {None}
+        if author_ids:
+            self.subscriptions.update(Subscription.objects.filter(
+                user=self.user, author_id__in=author_ids
+            ).values_list('author_id', flat=True))
+            self.loaded_authors.update(author_ids)
+
+    def remember(self, recipe_id, author_id, is_favorited,
+                 is_in_shopping_cart, is_subscribed):
+        if is_favorited:
+            self.favorites.add(recipe_id)
+        if is_in_shopping_cart:
+            self.shopping_cart.add(recipe_id)
+        if is_subscribed:
+            self.subscriptions.add(author_id)
+        self.loaded_recipes.add(recipe_id)
+        self.loaded_authors.add(author_id)
+
+    def mark_subscribed(self, author_ids):
+        author_ids = set(author_ids)
+        self.subscriptions.update(author_ids)
+        self.loaded_authors.update(author_ids)
+
+    def is_favorited(self, recipe_id):
+        if not self.user.is_authenticated:
+            return False
+        self.prime(recipe_ids=[recipe_id])
+        return recipe_id in self.favorites
+
+    def is_in_shopping_cart(self, recipe_id):
+        if not self.user.is_authenticated:
+            return False
+        self.prime(recipe_ids=[recipe_id])
+        return recipe_id in self.shopping_cart
+
+    def is_subscribed(self, author_id):
+        if not self.user.is_authenticated:
+            return False
+        self.prime(author_ids=[author_id])
+        return author_id in self.subscriptions
+
+
+def get_viewer_state(request):
+    if request is None:
+        return None
+
+    state = getattr(request, 'viewer_state', None)
+    if state is None:
+        state = request.viewer_state = ViewerState(request.user)
+    return state
+
+
+class ViewerStateListSerializer(ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, Manager) else data)
+        state = get_viewer_state(self.context.get('request'))
+        if state is not None:
+            self.child.prime_viewer_state(state, items)
+        return super().to_representation(items)
@@ -1,7 +1,6 @@
-from datetime import datetime
-
-from django.db.models import Sum
-from django.http import HttpResponse, HttpResponseRedirect
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django_filters.rest_framework import DjangoFilterBackend
@@ -9,6 +8,7 @@ from djoser.views import UserViewSet
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.status import HTTP_400_BAD_REQUEST
 from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
@@ -24,13 +24,29 @@ from .serializers import (
 from recipes.models import (
     Favourite,
     Ingredient,
-    IngredientInRecipe,
     Recipe,
     ShoppingCart,
     Tag
 )
+from .cache import get_version
+from .constants import (
+    INGREDIENTS_VERSION,
+    PROFILE_VERSION,
+    RECIPE_VERSION,
+    RECIPES_VERSION,
+    TAGS_VERSION
+)
 from .filters import IngredientFilter, RecipeFilter
+from .mixins import (
+    AnonymousResponseCacheMixin,
+    ConditionalGetMixin,
+    IngredientIndexMixin,
+    make_etag
+)
 from .pagination import FoodGramPagination
+from .parsers import MultiPartJSONParser, StreamingJSONParser
+from .short_links import short_links
+from .viewer_state import get_viewer_state
 from .serializers import (
     IngredientSerializer,
     RecipeReadSerializer,
@@ -38,6 +54,8 @@ from .serializers import (
     TagSerializer
 )
 from .permissions import IsAuthorAdminOrReadOnly
+from .renderers import CSVRenderer, PlainTextRenderer
+from .shopping_list import shopping_list_response
 
 
 class ProfileViewSet(UserViewSet):
@@ -90,9 +108,29 @@ class ProfileViewSet(UserViewSet):
 
     @action(detail=False, permission_classes=[IsAuthenticated])
     def subscriptions(self, request):
-        queryset = Profile.objects.filter(followers__user=request.user)
+        recipes = Recipe.objects.all()
+        limit = request.GET.get('recipes_limit')
+        if limit:
+            try:
+                recipes = recipes.filter(pk__in=Subquery(
+                    Recipe.objects.filter(
+                        author=OuterRef('author')
+                    ).values('pk')[:int(limit)]
+                ))
+            except ValueError:
+                pass
+
+        queryset = Profile.objects.filter(
+            followers__user=request.user
+        ).prefetch_related(
+            Prefetch('recipes', queryset=recipes, to_attr='limited_recipes')
+        )
+        page = self.paginate_queryset(queryset)
+        get_viewer_state(request).mark_subscribed(
+            author.pk for author in page
+        )
         serializer = UserSubscriptionSerializer(
-            self.paginate_queryset(queryset),
+            page,
             many=True,
             context={'request': request}
         )
@@ -126,33 +164,132 @@ class ProfileViewSet(UserViewSet):
 
 
 def redirect_to_recipe(request, recipe_hash):
-    recipe = get_object_or_404(Recipe, short_link_hash=recipe_hash)
-    relative_url = '/recipes/' + str(recipe.pk) + '/'
+    recipe_id = short_links.resolve(recipe_hash)
+    if recipe_id is None:
+        raise Http404('Рецепт не найден')
+    relative_url = '/recipes/' + str(recipe_id) + '/'
     full_url = request.build_absolute_uri(relative_url)
     return HttpResponseRedirect(full_url)
 
 
-class IngredientViewSet(ReadOnlyModelViewSet):
+class IngredientViewSet(
+    ConditionalGetMixin,
+    IngredientIndexMixin,
+    ReadOnlyModelViewSet
+):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = IngredientFilter
     http_method_names = ['get']
+    etag_version = INGREDIENTS_VERSION
+
+    def filter_queryset(self, queryset):
+        if self.action != 'list':
+            return queryset
+        return super().filter_queryset(queryset)
 
 
-class TagViewSet(ReadOnlyModelViewSet):
+class TagViewSet(ConditionalGetMixin, ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     http_method_names = ['get']
+    etag_version = TAGS_VERSION
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(
+    AnonymousResponseCacheMixin,
+    ConditionalGetMixin,
+    ModelViewSet
+):
     queryset = Recipe.objects.all()
     permission_classes = (IsAuthorAdminOrReadOnly,)
     pagination_class = FoodGramPagination
+    parser_classes = (StreamingJSONParser, MultiPartJSONParser)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipeFilter
     http_method_names = ['get', 'post', 'patch', 'delete']
+    etag_vary = ('Authorization',)
+
+    def annotate_user_state(self, queryset):
+        user = self.request.user
+        if not user.is_authenticated:
+            return queryset
+
+        return queryset.annotate(
+            is_favorited=Exists(Favourite.objects.filter(
+                user=user,
+                recipe=OuterRef('pk')
+            )),
+            is_in_shopping_cart=Exists(ShoppingCart.objects.filter(
+                user=user,
+                recipe=OuterRef('pk')
+            )),
+            is_subscribed=Exists(Subscription.objects.filter(
+                user=user,
+                author=OuterRef('author')
+            ))
+        )
+
+    def get_recipe_state(self):
+        if hasattr(self, '_recipe_state'):
+            return self._recipe_state
+
+        fields = ['updated_at', 'author_id']
+        if self.request.user.is_authenticated:
+            fields += ['is_favorited', 'is_in_shopping_cart', 'is_subscribed']
+        try:
+            self._recipe_state = self.annotate_user_state(
+                Recipe.objects.filter(pk=self.kwargs['pk'])
+            ).values(*fields).first()
+        except (TypeError, ValueError):
+            self._recipe_state = None
+        if self._recipe_state and self.request.user.is_authenticated:
+            state = self._recipe_state
+            get_viewer_state(self.request).remember(
+                int(self.kwargs['pk']),
+                state['author_id'],
+                state['is_favorited'],
+                state['is_in_shopping_cart'],
+                state['is_subscribed']
+            )
+        return self._recipe_state
+
+    def get_etag(self, request, *args, **kwargs):
+        if self.action != 'retrieve':
+            return None
+        state = self.get_recipe_state()
+        if state is None:
+            return None
+        return make_etag(
+            *state.values(),
+            get_version(PROFILE_VERSION.format(state['author_id'])),
+            get_version(INGREDIENTS_VERSION),
+            get_version(TAGS_VERSION)
+        )
+
+    def get_response_cache_versions(self):
+        if self.action == 'list':
+            recipe_version = RECIPES_VERSION
+        elif self.action == 'retrieve':
+            try:
+                recipe_version = RECIPE_VERSION.format(int(self.kwargs['pk']))
+            except ValueError:
+                return None
+        else:
+            return None
+        return (recipe_version, INGREDIENTS_VERSION, TAGS_VERSION)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (isinstance(response, Response)
+                and response.status_code >= HTTP_400_BAD_REQUEST
+                and isinstance(response.accepted_renderer, PlainTextRenderer)):
+            response.accepted_renderer = JSONRenderer()
+            response.accepted_media_type = JSONRenderer.media_type
+        return response
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
@@ -232,35 +369,19 @@ class RecipeViewSet(ModelViewSet):
 
     @action(
         detail=False,
-        permission_classes=[IsAuthenticated]
+        permission_classes=[IsAuthenticated],
+        renderer_classes=(PlainTextRenderer, CSVRenderer, JSONRenderer)
     )
     def download_shopping_cart(self, request):
         user = request.user
         if not user.shopping_cart.exists():
             return Response(status=HTTP_400_BAD_REQUEST)
 
-        ingredients = IngredientInRecipe.objects.filter(
-            recipe__shopping_cart__user=request.user
-        ).values(
-            'ingredient__name',
-            'ingredient__measurement_unit'
-        ).annotate(amount=Sum('amount'))
-
-        today = datetime.today()
-        shopping_list = (
-            f'Список покупок для: {user.get_full_name()}\n\n'
-            f'Дата: {today:%Y-%m-%d}\n\n'
+        # Под ASGI тело StreamingHttpResponse читается в event loop,
+        # где ORM недоступна, поэтому строки загружаются здесь.
+        return shopping_list_response(
+            user,
+            request.accepted_renderer.format,
+            request.accepted_renderer.media_type,
+            preload=isinstance(request._request, ASGIRequest)
         )
-        shopping_list += '\n'.join([
-            f'- {ingredient["ingredient__name"]} '
-            f'({ingredient["ingredient__measurement_unit"]})'
-            f' - {ingredient["amount"]}'
-            for ingredient in ingredients
-        ])
-        shopping_list += f'\n\nFoodgram ({today:%Y})'
-
-        filename = f'{user.username}_shopping_list.txt'
-        response = HttpResponse(shopping_list, content_type='text/plain')
-        response['Content-Disposition'] = f'attachment; filename={filename}'
-
-        return response
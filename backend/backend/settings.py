@@ -40,7 +40,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
     ],
 }
 
@@ -90,22 +90,40 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 if os.getenv('ENABLE_POSTGRES_DB', '').lower() == 'true':
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
+            'ENGINE': 'backend.postgresql',
             'NAME': os.getenv('POSTGRES_DB'),
             'USER': os.getenv('POSTGRES_USER'),
             'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
             'HOST': os.getenv('DB_HOST'),
-            'PORT': os.getenv('DB_PORT')
+            'PORT': os.getenv('DB_PORT'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': (
+                os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() == 'true'
+            ),
+            'OPTIONS': {
+                'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5)),
+                'keepalives': 1,
+                'keepalives_idle': int(os.getenv('DB_KEEPALIVES_IDLE', 60)),
+            }
         }
     }
 else:
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'backend.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -134,6 +152,22 @@ USE_TZ = True
 
 CSV_DATA_PATH = 'data/'
 
+INGREDIENT_INDEX_ENABLED = (
+    os.getenv('INGREDIENT_INDEX_ENABLED', 'true').lower() == 'true'
+)
+
+RESPONSE_CACHE_ENABLED = (
+    os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+)
+
+ASYNC_VIEWS_ENABLED = (
+    os.getenv('ASYNC_VIEWS_ENABLED', '').lower() == 'true'
+)
+
+IMAGE_PROCESSING_WORKERS = int(os.getenv('IMAGE_PROCESSING_WORKERS', 2))
+
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 10 * 1024 * 1024))
+
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'collected_static'
 
@@ -0,0 +1,10 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        connection.create_function(
+            'lower', 1, base.none_guard(str.lower), deterministic=True
+        )
+        return connection
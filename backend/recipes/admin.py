@@ -19,7 +19,7 @@ class RecipeAdmin(admin.ModelAdmin):
 
     @display(description='Количество в избранных')
     def added_in_favorites(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_count
 
 
 @admin.register(Ingredient)
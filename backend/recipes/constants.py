@@ -8,3 +8,7 @@ COOKING_TIME_MAX = 32000
 INGREDIENT_AMOUNT_MIN = 1
 INGREDIENT_AMOUNT_MAX = 32000
 SHORT_LINK_HASH = 5
+SHORT_LINK_ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789'
+SHORT_LINK_ATTEMPTS = 10
+IMPORT_BATCH_SIZE = 5000
+MEDIA_ORPHAN_MIN_AGE = 60
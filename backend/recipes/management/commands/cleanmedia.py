@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db.models import FileField
+from django.utils import timezone
+
+from recipes.constants import MEDIA_ORPHAN_MIN_AGE
+
+
+class Command(BaseCommand):
+    help = 'Удаляет файлы медиа, на которые не ссылается ни одна запись'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=MEDIA_ORPHAN_MIN_AGE,
+            help='Не трогать файлы моложе указанного числа минут'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        threshold = timezone.now() - timedelta(minutes=options['min_age'])
+        referenced = {}
+        for model in apps.get_models():
+            for field in model._meta.get_fields():
+                if not isinstance(field, FileField) or callable(
+                    field.upload_to
+                ):
+                    continue
+                _, names = referenced.setdefault(
+                    (field.storage.location, field.upload_to),
+                    (field.storage, set())
+                )
+                names.update(
+                    model.objects.exclude(
+                        **{field.name: ''}
+                    ).exclude(
+                        **{f'{field.name}__isnull': True}
+                    ).values_list(field.name, flat=True).iterator()
+                )
+
+        removed = 0
+        for (_, directory), (storage, names) in referenced.items():
+            if not storage.exists(directory):
+                continue
+            for filename in storage.listdir(directory)[1]:
+                name = f'{directory.rstrip("/")}/{filename}'
+                if (name in names
+                        or storage.get_modified_time(name) > threshold):
+                    continue
+                if not options['dry_run']:
+                    storage.delete(name)
+                removed += 1
+
+        verb = 'Найдено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            self.style.SUCCESS(f'{verb} неиспользуемых файлов: {removed}')
+        )
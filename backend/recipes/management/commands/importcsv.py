@@ -1,10 +1,14 @@
 import csv
 import os
+import time
+from itertools import islice
 
 from django.core.management.base import BaseCommand
 from django.conf import settings
 
+from recipes.constants import IMPORT_BATCH_SIZE
 from recipes.models import Ingredient, Tag
+from recipes.signals import data_imported
 
 
 class Command(BaseCommand):
@@ -13,28 +17,55 @@ class Command(BaseCommand):
         Tag: 'tags.csv',
     }
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=IMPORT_BATCH_SIZE
+        )
+
     def handle(self, *args, **options):
         csv_path = settings.CSV_DATA_PATH
         for model, filename in self.models_files.items():
-            self.import_data(model, os.path.join(csv_path, filename))
+            self.import_data(
+                model,
+                os.path.join(csv_path, filename),
+                options['batch_size']
+            )
 
-    def import_data(self, model, filename):
+    def import_data(self, model, filename, batch_size):
         try:
             self.stdout.write(self.style.WARNING(f'Старт импорта {filename}'))
+            started = time.monotonic()
+            read = created = 0
             with open(filename, encoding='utf-8') as file:
                 reader = csv.DictReader(file)
-                next_id = (
-                    model.objects.last().id + 1
-                    if model.objects.exists()
-                    else 1
-                )
-                for row in reader:
-                    if not model.objects.filter(**row).exists():
-                        model.objects.update_or_create(
-                            id=next_id,
-                            defaults=row
-                        )
-                        next_id += 1
-            self.stdout.write(self.style.SUCCESS(f'Импортирован {filename}'))
+                fields = reader.fieldnames
+                existing = set(model.objects.values_list(*fields))
+                while True:
+                    rows = list(islice(reader, batch_size))
+                    if not rows:
+                        break
+                    read += len(rows)
+                    objects = []
+                    for row in rows:
+                        key = tuple(row[field] for field in fields)
+                        if key not in existing:
+                            existing.add(key)
+                            objects.append(model(**row))
+                    model.objects.bulk_create(
+                        objects,
+                        batch_size=batch_size,
+                        ignore_conflicts=True
+                    )
+                    created += len(objects)
+                    self.stdout.write(
+                        f'Обработано строк: {read}, добавлено: {created}'
+                    )
+            data_imported.send(sender=model)
+            self.stdout.write(self.style.SUCCESS(
+                f'Импортирован {filename} '
+                f'за {time.monotonic() - started:.1f} с'
+            ))
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'Ошибка {filename}: {e}'))
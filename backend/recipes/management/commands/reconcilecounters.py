@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import Favourite, Recipe, ShoppingCart
+from users.models import Profile, Subscription
+
+
+def count_related(model, field):
+    return Coalesce(
+        Subquery(
+            model.objects.filter(
+                **{field: OuterRef('pk')}
+            ).order_by().values(field).annotate(
+                total=Count('pk')
+            ).values('total')
+        ),
+        0
+    )
+
+
+class Command(BaseCommand):
+    counters = (
+        (Recipe, 'favorites_count', Favourite, 'recipe'),
+        (Recipe, 'cart_count', ShoppingCart, 'recipe'),
+        (Profile, 'recipes_count', Recipe, 'author'),
+        (Profile, 'followers_count', Subscription, 'author'),
+    )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        for model, field, related_model, related_field in self.counters:
+            actual = count_related(related_model, related_field)
+            fixed = model.objects.annotate(
+                actual=actual
+            ).exclude(
+                **{field: F('actual')}
+            ).update(**{field: actual})
+            self.stdout.write(
+                f'{model.__name__}.{field}: исправлено записей {fixed}'
+            )
+        self.stdout.write(self.style.SUCCESS('Счётчики сверены'))
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 17:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_recipe_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='rendered',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='Готовое представление'),
+        ),
+    ]
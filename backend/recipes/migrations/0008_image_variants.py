@@ -0,0 +1,29 @@
+# Generated by Django 3.2 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+
+def reset_rendered(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.update(rendered=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_rendered'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_medium',
+            field=models.ImageField(blank=True, editable=False, upload_to='recipes/medium/', verbose_name='Изображение среднего размера'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='recipes/thumbnails/', verbose_name='Миниатюра'),
+        ),
+        migrations.RunPython(reset_rendered, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2 on 2026-10-18 17:52
+
+import backend.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(storage=backend.storage.HashedFileSystemStorage(), upload_to='recipes/', verbose_name='Изображение'),
+        ),
+    ]
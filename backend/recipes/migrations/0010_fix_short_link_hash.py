@@ -0,0 +1,48 @@
+from django.db import migrations
+from django.db.models import Count
+from django.utils.crypto import get_random_string
+
+SHORT_LINK_HASH = 5
+SHORT_LINK_ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789'
+
+
+def fix_short_link_hashes(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    used = set(Recipe.objects.values_list('short_link_hash', flat=True))
+    duplicates = Recipe.objects.order_by().values(
+        'short_link_hash'
+    ).annotate(
+        total=Count('pk')
+    ).filter(total__gt=1).values_list('short_link_hash', flat=True)
+    broken = Recipe.objects.filter(
+        short_link_hash__in=list(duplicates)
+    ) | Recipe.objects.filter(short_link_hash='')
+
+    seen = set()
+    for recipe in broken.order_by('pk'):
+        if recipe.short_link_hash and recipe.short_link_hash not in seen:
+            seen.add(recipe.short_link_hash)
+            continue
+
+        short_link_hash = recipe.short_link_hash
+        while short_link_hash in used or not short_link_hash:
+            short_link_hash = get_random_string(
+                SHORT_LINK_HASH, SHORT_LINK_ALPHABET
+            )
+        used.add(short_link_hash)
+        Recipe.objects.filter(pk=recipe.pk).update(
+            short_link_hash=short_link_hash
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_hashed_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            fix_short_link_hashes, migrations.RunPython.noop
+        ),
+    ]
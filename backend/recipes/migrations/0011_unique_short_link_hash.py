@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_fix_short_link_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='short_link_hash',
+            field=models.CharField(blank=True, max_length=5, unique=True, verbose_name='Хэш короткой ссылки'),
+        ),
+    ]
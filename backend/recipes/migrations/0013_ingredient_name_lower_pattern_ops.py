@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def use_pattern_ops(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX ingredient_name_lower_idx')
+        schema_editor.execute(
+            'CREATE INDEX ingredient_name_lower_idx ON recipes_ingredient '
+            '(lower(name) text_pattern_ops)'
+        )
+
+
+def use_default_ops(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX ingredient_name_lower_idx')
+        schema_editor.execute(
+            'CREATE INDEX ingredient_name_lower_idx ON recipes_ingredient '
+            '(lower(name))'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_reindex_ingredient_name_lower'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_pattern_ops, use_default_ops),
+    ]
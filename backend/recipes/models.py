@@ -1,9 +1,10 @@
-import hashlib
-
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.db.models import UniqueConstraint
+from django.db.models.functions import Lower
+from django.utils.crypto import get_random_string
 
+from backend.storage import HashedFileSystemStorage
 from users.models import Profile
 from .constants import (
     INGREDIENT_NAME,
@@ -15,6 +16,8 @@ from .constants import (
     COOKING_TIME_MAX,
     INGREDIENT_AMOUNT_MIN,
     INGREDIENT_AMOUNT_MAX,
+    SHORT_LINK_ALPHABET,
+    SHORT_LINK_ATTEMPTS,
     SHORT_LINK_HASH
 )
 
@@ -34,6 +37,9 @@ class Ingredient(models.Model):
             UniqueConstraint(fields=['name', 'measurement_unit'],
                              name='unique_ingredient')
         ]
+        indexes = [
+            models.Index(Lower('name'), name='ingredient_name_lower_idx')
+        ]
 
     def __str__(self):
         return f'{self.name}, {self.measurement_unit}'
@@ -64,6 +70,7 @@ class Recipe(models.Model):
     short_link_hash = models.CharField(
         'Хэш короткой ссылки',
         max_length=SHORT_LINK_HASH,
+        unique=True,
         blank=True
     )
     author = models.ForeignKey(
@@ -76,7 +83,20 @@ class Recipe(models.Model):
     text = models.TextField('Описание')
     image = models.ImageField(
         'Изображение',
-        upload_to='recipes/'
+        upload_to='recipes/',
+        storage=HashedFileSystemStorage()
+    )
+    image_thumbnail = models.ImageField(
+        'Миниатюра',
+        upload_to='recipes/thumbnails/',
+        blank=True,
+        editable=False
+    )
+    image_medium = models.ImageField(
+        'Изображение среднего размера',
+        upload_to='recipes/medium/',
+        blank=True,
+        editable=False
     )
     cooking_time = models.PositiveSmallIntegerField(
         'Время приготовления',
@@ -102,21 +122,61 @@ class Recipe(models.Model):
         related_name='recipes',
         verbose_name='Теги'
     )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
+    favorites_count = models.PositiveIntegerField(
+        'Количество в избранных',
+        default=0,
+        editable=False
+    )
+    cart_count = models.PositiveIntegerField(
+        'Количество в корзинах',
+        default=0,
+        editable=False
+    )
+    rendered = models.JSONField(
+        'Готовое представление',
+        null=True,
+        blank=True,
+        editable=False
+    )
+
+    counter_fields = ('favorites_count', 'cart_count')
+    variant_fields = ('image_thumbnail', 'image_medium')
+    payload_fields = ('rendered',)
 
     class Meta:
         ordering = ['-id']
         verbose_name = 'рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(fields=['author', '-id'], name='recipe_author_id_idx')
+        ]
 
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        recipe_hash = hashlib.md5(
-            str(
-                self.id
-            ).encode()
-        ).hexdigest()[:SHORT_LINK_HASH]
-        self.short_link_hash = recipe_hash
-        super().save(update_fields=['short_link_hash'])
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and field.name not in self.variant_fields
+                and field.name not in self.payload_fields
+            ]
+        if not self._state.adding or self.short_link_hash:
+            return super().save(*args, **kwargs)
+
+        for attempt in range(1, SHORT_LINK_ATTEMPTS + 1):
+            self.short_link_hash = get_random_string(
+                SHORT_LINK_HASH, SHORT_LINK_ALPHABET
+            )
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if (attempt == SHORT_LINK_ATTEMPTS
+                        or not Recipe.objects.filter(
+                            short_link_hash=self.short_link_hash
+                        ).exists()):
+                    raise
 
     def __str__(self):
         return self.name
@@ -184,6 +244,12 @@ class Favourite(FavouriteShoppingCartBase):
             UniqueConstraint(fields=['user', 'recipe'],
                              name='unique_favourite')
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'user'],
+                name='favourite_recipe_user_idx'
+            )
+        ]
 
     def __str__(self):
         return f'{self.user} добавил "{self.recipe}" в Избранное'
@@ -200,6 +266,12 @@ class ShoppingCart(FavouriteShoppingCartBase):
                 name='unique_shopping_cart'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['recipe', 'user'],
+                name='shopping_cart_recipe_user_idx'
+            )
+        ]
 
     def __str__(self):
         return f'{self.user} добавил "{self.recipe}" в Корзину покупок'
@@ -0,0 +1,70 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from users.models import Profile
+from .models import Favourite, Recipe, ShoppingCart
+
+data_imported = Signal()
+
+
+def change_counter(queryset, field, delta):
+    queryset.update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=Favourite)
+def favourite_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            Recipe.objects.filter(pk=instance.recipe_id),
+            'favorites_count',
+            1
+        )
+
+
+@receiver(post_delete, sender=Favourite)
+def favourite_deleted(sender, instance, **kwargs):
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id),
+        'favorites_count',
+        -1
+    )
+
+
+@receiver(post_save, sender=ShoppingCart)
+def shopping_cart_created(sender, instance, created, **kwargs):
+    if created:
+        change_counter(
+            Recipe.objects.filter(pk=instance.recipe_id),
+            'cart_count',
+            1
+        )
+
+
+@receiver(post_delete, sender=ShoppingCart)
+def shopping_cart_deleted(sender, instance, **kwargs):
+    change_counter(
+        Recipe.objects.filter(pk=instance.recipe_id),
+        'cart_count',
+        -1
+    )
+
+
+@receiver(post_save, sender=Recipe)
+def recipe_created(sender, instance, created, **kwargs):
+    if created and instance.author_id:
+        change_counter(
+            Profile.objects.filter(pk=instance.author_id),
+            'recipes_count',
+            1
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+def recipe_deleted(sender, instance, **kwargs):
+    if instance.author_id:
+        change_counter(
+            Profile.objects.filter(pk=instance.author_id),
+            'recipes_count',
+            -1
+        )
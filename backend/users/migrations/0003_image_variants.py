@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_profile_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='avatar_thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='avatars/thumbnails/', verbose_name='Миниатюра аватара'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2 on 2026-10-18 17:52
+
+import backend.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='profile',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, storage=backend.storage.HashedFileSystemStorage(), upload_to='avatars/'),
+        ),
+    ]
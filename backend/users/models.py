@@ -2,11 +2,23 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.db.models import UniqueConstraint
 
+from backend.storage import HashedFileSystemStorage
 from .constants import NAME_LENGTH, LAST_NAME_LENGTH
 
 
 class Profile(AbstractUser):
-    avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar = models.ImageField(
+        upload_to='avatars/',
+        storage=HashedFileSystemStorage(),
+        blank=True,
+        null=True
+    )
+    avatar_thumbnail = models.ImageField(
+        'Миниатюра аватара',
+        upload_to='avatars/thumbnails/',
+        blank=True,
+        editable=False
+    )
     first_name = models.CharField(
         max_length=NAME_LENGTH,
         blank=False
@@ -19,6 +31,16 @@ class Profile(AbstractUser):
         blank=False,
         unique=True
     )
+    recipes_count = models.PositiveIntegerField(
+        'Количество рецептов',
+        default=0,
+        editable=False
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+        editable=False
+    )
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = [
@@ -27,11 +49,24 @@ class Profile(AbstractUser):
         'last_name',
     ]
 
+    counter_fields = ('recipes_count', 'followers_count')
+    variant_fields = ('avatar_thumbnail',)
+
     class Meta:
         ordering = ['first_name', 'last_name', 'username', 'email']
         verbose_name = 'профиль'
         verbose_name_plural = 'Профили пользователей'
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and field.name not in self.variant_fields
+            ]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.email
 